@@ -1,22 +1,50 @@
 import os
+import re
 import json
 import shutil
+import functools
+import gzip
 import threading
 import time
 from datetime import datetime
+from pathlib import Path
 from flask import Flask, render_template, jsonify, request, redirect, Response
 from lib import tmx_processing
 
 # Version 1.12 - Load concordances on-demand, not in initial payload
-# Auto-backup TMX files every 30 minutes
+# Auto-backup TMX files every 30 minutes (only when segments were edited)
 
 app = Flask(__name__)
 PROJECTS_DIR = os.path.join(os.getcwd(), "Projects")
+URL_SCHEME_RE = re.compile(r"^https?://", re.IGNORECASE)
 
 
 # -------------------------------------------------
 # TMX Backup System
 # -------------------------------------------------
+def copy_file_in_kernel(src, dst):
+    """
+    Copy src to dst with os.copy_file_range where available (Linux), so bytes
+    never pass through userspace and CoW filesystems can share extents.
+    Falls back to shutil.copy2; timestamps are preserved either way.
+    """
+    if hasattr(os, "copy_file_range"):
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                remaining = os.fstat(fsrc.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+            if remaining == 0:
+                shutil.copystat(src, dst)
+                return
+        except OSError:
+            pass
+    shutil.copy2(src, dst)
+
+
 def backup_tmx(project_path):
     """Create a backup of project.tmx in backups folder, keeping max 3 backups"""
     tmx_file = os.path.join(project_path, "target", "project.tmx")
@@ -26,50 +54,80 @@ def backup_tmx(project_path):
     
     # Create backups directory
     backups_dir = os.path.join(project_path, "backups")
-    if not os.path.exists(backups_dir):
-        os.makedirs(backups_dir)
+    os.makedirs(backups_dir, exist_ok=True)
     
     # Create timestamped backup filename
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     backup_file = os.path.join(backups_dir, f"project_tmx_backup_{timestamp}.tmx")
     
-    # Copy TMX to backup
-    shutil.copy2(tmx_file, backup_file)
+    # Copy TMX to backup, holding off writers so they can't swap the file mid-copy
+    with tmx_processing.tmx_lock(project_path):
+        copy_file_in_kernel(tmx_file, backup_file)
     
-    # Keep only the 3 most recent backups
-    backups = sorted(
-        [f for f in os.listdir(backups_dir) if f.startswith("project_tmx_backup_") and f.endswith(".tmx")],
-        reverse=True
-    )
+    # Keep only the 3 most recent backups (timestamped names sort chronologically)
+    with os.scandir(backups_dir) as entries:
+        backups = sorted(
+            (e for e in entries if e.name.startswith("project_tmx_backup_") and e.name.endswith(".tmx")),
+            key=lambda e: e.name,
+            reverse=True
+        )
     
     # Delete older backups beyond the 3 most recent
     for old_backup in backups[3:]:
-        old_backup_path = os.path.join(backups_dir, old_backup)
-        os.remove(old_backup_path)
-        print(f"Deleted old backup: {old_backup}")
+        os.remove(old_backup.path)
+        print(f"Deleted old backup: {old_backup.name}")
     
     print(f"Created TMX backup: {backup_file}")
 
 
+# project name -> TMX st_mtime_ns at its last backup
+_last_backup_mtimes = {}
+
+
 def backup_all_projects():
-    """Backup TMX files for all projects"""
+    """Backup TMX files for all projects whose TMX changed since their last backup"""
     if not os.path.exists(PROJECTS_DIR):
         return
     
-    for project_name in os.listdir(PROJECTS_DIR):
-        project_path = os.path.join(PROJECTS_DIR, project_name)
-        if os.path.isdir(project_path):
-            try:
-                backup_tmx(project_path)
-            except Exception as e:
-                print(f"Error backing up {project_name}: {e}")
+    with os.scandir(PROJECTS_DIR) as entries:
+        project_dirs = [(e.name, e.path) for e in entries if e.is_dir()]
+    
+    for project_name, project_path in project_dirs:
+        tmx_file = os.path.join(project_path, "target", "project.tmx")
+        try:
+            # Edits sit in updates.log until compacted; back up the full translation
+            tmx_processing.compact_tmx(project_path)
+        except Exception as e:
+            # Still back up what project.tmx holds
+            print(f"Error compacting {project_name}: {e}")
+        try:
+            mtime = os.stat(tmx_file).st_mtime_ns
+        except FileNotFoundError:
+            continue
+        if _last_backup_mtimes.get(project_name) == mtime:
+            continue
+        try:
+            backup_tmx(project_path)
+            _last_backup_mtimes[project_name] = mtime
+        except Exception as e:
+            print(f"Error backing up {project_name}: {e}")
 
 
 def backup_timer():
-    """Background thread to backup TMX files every 30 minutes"""
+    """
+    Background thread to backup TMX files at most every 30 minutes, and only
+    after edits or TMX writes (tmx_processing.tmx_changed). Within a round,
+    projects whose TMX is unchanged are skipped by mtime.
+    """
     while True:
         time.sleep(1800)  # 30 minutes = 1800 seconds
-        backup_all_projects()
+        tmx_processing.tmx_changed.wait()
+        tmx_processing.tmx_changed.clear()
+        try:
+            backup_all_projects()
+        except Exception as e:
+            # Keep the thread alive; the next round tries again
+            print(f"Error in backup run: {e}")
 
 
 # Start backup thread
@@ -79,13 +137,27 @@ print("TMX backup system started (every 30 minutes)")
 
 
 
+# (mtime_ns of PROJECTS_DIR, project names) - adding, removing or renaming a
+# project folder changes the directory's mtime
+_projects_cache = (None, None)
+
+
 def list_projects():
-    if not os.path.exists(PROJECTS_DIR):
-        os.makedirs(PROJECTS_DIR)
-    return [
-        d for d in os.listdir(PROJECTS_DIR)
-        if os.path.isdir(os.path.join(PROJECTS_DIR, d))
-    ]
+    global _projects_cache
+    try:
+        mtime = os.stat(PROJECTS_DIR).st_mtime_ns
+    except FileNotFoundError:
+        os.makedirs(PROJECTS_DIR, exist_ok=True)
+        mtime = os.stat(PROJECTS_DIR).st_mtime_ns
+
+    cached_mtime, projects = _projects_cache
+    if cached_mtime != mtime:
+        # scandir's entries know whether they are directories - no stat per entry
+        with os.scandir(PROJECTS_DIR) as entries:
+            projects = [entry.name for entry in entries if entry.is_dir()]
+        _projects_cache = (mtime, projects)
+
+    return list(projects)
 
 
 @app.route("/")
@@ -120,177 +192,264 @@ def dashboard(project_name):
 
 
 # -------------------------------------------------
-# User preferences helpers
+# JSON file helpers
 # -------------------------------------------------
-def get_preferences(project_path):
-    cache_dir = os.path.join(project_path, "cache")
-    if not os.path.exists(cache_dir):
-        os.makedirs(cache_dir)
+def read_json_file(path):
+    """Parse a JSON file from a single read_bytes() - json decodes the UTF-8 bytes itself"""
+    return json.loads(Path(path).read_bytes())
 
-    prefs_file = os.path.join(cache_dir, "preferences.json")
-    if not os.path.exists(prefs_file):
-        return {"default_view": "dashboard"}
 
+def load_json(path, default):
+    """
+    Parse a JSON file, or return default if it is missing or unreadable.
+    No exists() check first - a missing file is just a failed read.
+    """
     try:
-        with open(prefs_file, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return read_json_file(path)
     except Exception:
-        return {"default_view": "dashboard"}
+        return default
 
 
-def save_preference(project_path, key, value):
-    cache_dir = os.path.join(project_path, "cache")
-    if not os.path.exists(cache_dir):
-        os.makedirs(cache_dir)
+@functools.lru_cache(maxsize=32)
+def parse_json_version(path, signature):
+    """
+    Parsed JSON of one version (signature) of a file. Bounded like the other
+    memos: the 32 most recently used versions stay in memory. No lock is held
+    while parsing, so requests for other files never wait on a large parse.
+    """
+    return read_json_file(path)
 
-    prefs_file = os.path.join(cache_dir, "preferences.json")
 
-    prefs = {}
-    if os.path.exists(prefs_file):
-        try:
-            with open(prefs_file, "r", encoding="utf-8") as f:
-                prefs = json.load(f)
-        except Exception:
-            prefs = {}
+def read_json_cached(path):
+    """
+    Parse a JSON file, reusing the parsed result while the file's mtime and
+    size are unchanged. Raises like read_json_file() on a missing or bad file.
+    The inode is part of the signature: writers replace the file, so a same-size
+    rewrite within one mtime tick still counts as a change.
+    Callers must treat the data as read-only.
+    """
+    st = os.stat(path)
+    return parse_json_version(path, (st.st_mtime_ns, st.st_size, st.st_ino))
 
-    prefs[key] = value
 
-    with open(prefs_file, "w", encoding="utf-8") as f:
-        json.dump(prefs, f, ensure_ascii=False, indent=2)
+def load_json_cached(path):
+    """Like read_json_cached(), but returns {} if the file is missing or unreadable"""
+    try:
+        return read_json_cached(path)
+    except Exception:
+        return {}
 
 
-# -------------------------------------------------
-# Concordance suppressions helpers
-# -------------------------------------------------
-def get_suppressions(project_path):
-    cache_dir = os.path.join(project_path, "cache")
-    if not os.path.exists(cache_dir):
-        os.makedirs(cache_dir)
+def write_json_atomic(path, data):
+    """
+    Write JSON to a temp file and swap it in, so a crash never leaves a torn file.
+    Serialized up front and written with one call; fsync'd before the rename so
+    the new contents are on disk before the old file disappears. The temp name
+    is per thread, so concurrent saves of the same file can't interleave.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    payload = json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+    tmp_file = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_file, "wb") as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, path)
 
-    suppressions_file = os.path.join(cache_dir, "concordance_suppressions.json")
-    if not os.path.exists(suppressions_file):
-        return {"pos": [], "lemmas": []}
 
-    try:
-        with open(suppressions_file, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return {"pos": [], "lemmas": []}
+# -------------------------------------------------
+# User preferences helpers
+# -------------------------------------------------
+def get_preferences(project_path):
+    prefs_file = os.path.join(project_path, "cache", "preferences.json")
+    return load_json(prefs_file, {"default_view": "dashboard"})
 
 
-def save_suppressions(project_path, suppressions):
-    cache_dir = os.path.join(project_path, "cache")
-    if not os.path.exists(cache_dir):
-        os.makedirs(cache_dir)
+def save_preference(project_path, key, value):
+    prefs_file = os.path.join(project_path, "cache", "preferences.json")
+    prefs = load_json(prefs_file, {})
+    prefs[key] = value
+    write_json_atomic(prefs_file, prefs)
 
-    suppressions_file = os.path.join(cache_dir, "concordance_suppressions.json")
 
-    with open(suppressions_file, "w", encoding="utf-8") as f:
-        json.dump(suppressions, f, ensure_ascii=False, indent=2)
+# -------------------------------------------------
+# Concordance suppressions helpers
+# -------------------------------------------------
+def get_suppressions(project_path):
+    suppressions_file = os.path.join(project_path, "cache", "concordance_suppressions.json")
+    return load_json(suppressions_file, {"pos": [], "lemmas": []})
 
 
-def rebuild_working_lemmas(project_path, suppressions):
-    """DEPRECATED - kept for backwards compatibility"""
-    pass
+def save_suppressions(project_path, suppressions):
+    suppressions_file = os.path.join(project_path, "cache", "concordance_suppressions.json")
+    write_json_atomic(suppressions_file, suppressions)
 
 
 # -------------------------------------------------
 # NAOB overrides helpers
 # -------------------------------------------------
 def get_naob_overrides(project_path):
-    cache_dir = os.path.join(project_path, "cache")
-    if not os.path.exists(cache_dir):
-        os.makedirs(cache_dir)
+    overrides_file = os.path.join(project_path, "cache", "naob_overrides.json")
+    return load_json_cached(overrides_file)
 
-    overrides_file = os.path.join(cache_dir, "naob_overrides.json")
-    if not os.path.exists(overrides_file):
-        return {}
-
-    try:
-        with open(overrides_file, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return {}
 
+def normalize_naob_url(url):
+    url = url.strip()
+    if not URL_SCHEME_RE.match(url):
+        url = "https://" + url
+    return url
 
-def save_naob_override(project_path, lemma_key, url):
-    cache_dir = os.path.join(project_path, "cache")
-    if not os.path.exists(cache_dir):
-        os.makedirs(cache_dir)
 
-    overrides_file = os.path.join(cache_dir, "naob_overrides.json")
+def save_naob_overrides(project_path, updates):
+    """Apply {lemma_key: url} updates with a single read and a single write"""
+    overrides_file = os.path.join(project_path, "cache", "naob_overrides.json")
+    overrides = load_json(overrides_file, {})
 
-    overrides = {}
-    if os.path.exists(overrides_file):
-        try:
-            with open(overrides_file, "r", encoding="utf-8") as f:
-                overrides = json.load(f)
-        except Exception:
-            overrides = {}
+    changed = False
+    for lemma_key, url in updates.items():
+        url = normalize_naob_url(url)
+        if overrides.get(lemma_key) != url:
+            overrides[lemma_key] = url
+            changed = True
 
-    url = url.strip()
-    if not url.startswith(("http://", "https://")):
-        url = "https://" + url
+    if changed:
+        write_json_atomic(overrides_file, overrides)
 
-    overrides[lemma_key] = url
 
-    with open(overrides_file, "w", encoding="utf-8") as f:
-        json.dump(overrides, f, ensure_ascii=False, indent=2)
+def save_naob_override(project_path, lemma_key, url):
+    save_naob_overrides(project_path, {lemma_key: url})
 
 
 # -------------------------------------------------
 # Meanings helpers
 # -------------------------------------------------
 def get_meanings(project_path):
-    cache_dir = os.path.join(project_path, "cache")
-    if not os.path.exists(cache_dir):
-        os.makedirs(cache_dir)
+    meanings_file = os.path.join(project_path, "cache", "meanings.json")
+    return load_json_cached(meanings_file)
 
-    meanings_file = os.path.join(cache_dir, "meanings.json")
-    if not os.path.exists(meanings_file):
-        return {}
 
-    try:
-        with open(meanings_file, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return {}
+def save_meanings(project_path, updates):
+    """Apply {lemma_key: meaning} updates with a single read and a single write"""
+    meanings_file = os.path.join(project_path, "cache", "meanings.json")
+    meanings = load_json(meanings_file, {})
+
+    changed = False
+    for lemma_key, meaning in updates.items():
+        if meanings.get(lemma_key) != meaning:
+            meanings[lemma_key] = meaning
+            changed = True
+
+    if changed:
+        write_json_atomic(meanings_file, meanings)
 
 
 def save_meaning(project_path, lemma_key, meaning):
-    cache_dir = os.path.join(project_path, "cache")
-    if not os.path.exists(cache_dir):
-        os.makedirs(cache_dir)
+    save_meanings(project_path, {lemma_key: meaning})
 
-    meanings_file = os.path.join(cache_dir, "meanings.json")
 
-    meanings = {}
-    if os.path.exists(meanings_file):
-        try:
-            with open(meanings_file, "r", encoding="utf-8") as f:
-                meanings = json.load(f)
-        except Exception:
-            meanings = {}
+def read_project_meta(project_path):
+    """(naob_overrides, meanings, suppressions) for load_project in one sweep of the cache folder"""
+    cache_dir = os.path.join(project_path, "cache")
+    return (
+        load_json_cached(os.path.join(cache_dir, "naob_overrides.json")),
+        load_json_cached(os.path.join(cache_dir, "meanings.json")),
+        load_json(os.path.join(cache_dir, "concordance_suppressions.json"), {"pos": [], "lemmas": []}),
+    )
 
-    meanings[lemma_key] = meaning
 
-    with open(meanings_file, "w", encoding="utf-8") as f:
-        json.dump(meanings, f, ensure_ascii=False, indent=2)
+# -------------------------------------------------
+# load_project response cache
+# -------------------------------------------------
+# Every file the /project/<name> response is built from
+PROJECT_DATA_FILES = (
+    os.path.join("target", "project.tmx"),
+    os.path.join("target", "updates.log"),
+    os.path.join("cache", "lemmas.json"),
+    os.path.join("cache", "lemmas_master.json"),
+    os.path.join("cache", "tokens.json"),
+    os.path.join("cache", "segment_files.json"),
+    os.path.join("cache", "naob_overrides.json"),
+    os.path.join("cache", "meanings.json"),
+    os.path.join("cache", "concordance_suppressions.json"),
+)
+
+# The files extract_lemmas() reads
+LEMMA_CACHE_FILES = (
+    os.path.join("cache", "lemmas.json"),
+    os.path.join("cache", "lemmas_master.json"),
+)
+
+# Single slot: [(project_name, source_file), fingerprint, response body, gzipped
+# body or None] of the last load. Reloads are nearly always for the same project,
+# and one slot keeps memory bounded to one response.
+_last_load = None
+
+# Bodies smaller than this aren't worth gzipping
+GZIP_MIN_SIZE = 1024
+
+
+def get_project_fingerprint(project_path, rel_paths=PROJECT_DATA_FILES):
+    """(mtime, size, inode) of each project data file; changes whenever any of them is written"""
+    fingerprint = []
+    for rel_path in rel_paths:
+        try:
+            st = os.stat(os.path.join(project_path, rel_path))
+            fingerprint.append((st.st_mtime_ns, st.st_size, st.st_ino))
+        except FileNotFoundError:
+            fingerprint.append(None)
+    return tuple(fingerprint)
+
+
+@functools.lru_cache(maxsize=16)
+def get_lemma_wordforms(project_path, lemma_files_fingerprint):
+    """
+    {lemma_key: [wordforms]} from extract_lemmas(), memoized per fingerprint of
+    the lemma cache files. Occurrences are dropped: load_project doesn't send
+    them and they are most of the cache's size.
+    """
+    segments = tmx_processing.load_segments(project_path, include_tokens=False)
+    lemmas = tmx_processing.extract_lemmas(segments, project_path=project_path)
+    return {key: list(data["wordforms"]) for key, data in lemmas.items()}
+
+
+def send_project_body(entry):
+    """
+    Send a load_project cache entry. The JSON is highly repetitive (tokens,
+    wordforms), so clients that accept gzip get it compressed - once per body.
+    """
+    body = entry[2]
+    if request.accept_encodings["gzip"] and len(body) >= GZIP_MIN_SIZE:
+        if entry[3] is None:
+            entry[3] = gzip.compress(body, compresslevel=6)
+        response = app.response_class(entry[3], mimetype="application/json")
+        response.headers["Content-Encoding"] = "gzip"
+    else:
+        response = app.response_class(body, mimetype="application/json")
+    response.headers["Vary"] = "Accept-Encoding"
+    return response
 
 
 @app.route("/project/<project_name>")
 def load_project(project_name):
     """V1.12: Load segments with tokens from TMX; lemmas WITHOUT concordances"""
+    global _last_load
     project_path = os.path.join(PROJECTS_DIR, project_name)
     if not os.path.exists(project_path):
         return jsonify({"error": "Project not found"}), 404
 
+    # Taken before building, so a file written mid-build just causes a rebuild next time
+    fingerprint = get_project_fingerprint(project_path)
+    cache_key = (project_name, request.args.get("source_file"))
+    last_load = _last_load  # one read, another request may replace it
+    if last_load and last_load[0] == cache_key and last_load[1] == fingerprint:
+        return send_project_body(last_load)
+
     # V1.11: Load segments WITH tokens from TMX (fast - just XML/JSON parsing)
     segments = tmx_processing.load_segments(project_path, include_tokens=True)
-    lemmas = tmx_processing.extract_lemmas(segments, project_path=project_path)
-    naob_overrides = get_naob_overrides(project_path)
-    meanings = get_meanings(project_path)
-    suppressions = get_suppressions(project_path)
+    lemma_wordforms = get_lemma_wordforms(
+        project_path, get_project_fingerprint(project_path, LEMMA_CACHE_FILES)
+    )
+    naob_overrides, meanings, suppressions = read_project_meta(project_path)
     
     source_files = tmx_processing.get_source_files_list(project_path)
     segment_files_map = tmx_processing.get_segment_files_map(project_path)
@@ -298,18 +457,21 @@ def load_project(project_name):
     source_file_filter = request.args.get("source_file")
 
     seg_list = []
+    tokens_cache = None
     for s in segments:
         if source_file_filter:
             if segment_files_map.get(s["id"]) != source_file_filter:
                 continue
-        
+
         # V1.11: Use tokens from TMX if available
         if s.get("tokens"):
             tokens = s["tokens"]
         else:
-            # Fallback: if tokens not in TMX, return empty
-            # (This shouldn't happen if concordances were built)
-            tokens = []
+            # Fallback: look up the tokens cache (e.g. TMX was regenerated),
+            # otherwise return empty - never run Stanza on page load
+            if tokens_cache is None:
+                tokens_cache = tmx_processing.load_tokens_cache(project_path)
+            tokens = tokens_cache.get(tmx_processing.get_source_hash(s["source"]), [])
         
         seg_list.append({
             "id": s["id"],
@@ -320,16 +482,18 @@ def load_project(project_name):
         })
 
     # V1.12: Return lemmas WITHOUT occurrences (loaded on-demand)
+    # Sorted here because the response below skips jsonify's sort_keys
     lemma_dict = {}
-    for key, data in lemmas.items():
+    for key in sorted(lemma_wordforms):
+        lemma, pos = key.split("|", 1)
         lemma_dict[key] = {
-            "lemma": key.split("|")[0],
-            "pos": key.split("|")[1],
-            "wordforms": list(data["wordforms"])
+            "lemma": lemma,
+            "pos": pos,
+            "wordforms": lemma_wordforms[key]
             # Occurrences excluded - fetched on-demand via /lemma/<key>/concordances
         }
 
-    return jsonify({
+    payload = {
         "segments": seg_list,
         "lemmas": lemma_dict,
         "naob_overrides": naob_overrides,
@@ -337,7 +501,13 @@ def load_project(project_name):
         "suppressions": suppressions,
         "source_files": source_files,
         "segment_files_map": segment_files_map
-    })
+    }
+
+    # This is the largest response in the app: serialize it compact and as UTF-8,
+    # instead of jsonify (which sorts every nested dict and indents in debug mode)
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    _last_load = [cache_key, fingerprint, body, None]
+    return send_project_body(_last_load)
 
 
 @app.route("/project/<project_name>/lemma/<lemma_key>/concordances")
@@ -352,8 +522,24 @@ def get_lemma_concordances(project_name, lemma_key):
         return jsonify({"error": "Concordances not built yet"}), 404
     
     try:
-        with open(cache_file, "r", encoding="utf-8") as f:
-            lemmas = json.load(f)
+        # Read just this lemma's span from lemmas.dat when the index is current
+        index_file, data_file, sources_file = tmx_processing.get_concordance_index_files(project_path)
+        try:
+            index_fresh = os.stat(index_file).st_mtime_ns >= os.stat(cache_file).st_mtime_ns
+        except FileNotFoundError:
+            index_fresh = False
+        
+        if index_fresh:
+            span = read_json_cached(index_file).get(lemma_key)
+            if span is None:
+                return jsonify({"error": "Lemma not found"}), 404
+            return jsonify({
+                "occurrences": tmx_processing.read_lemma_occurrences(
+                    data_file, span, read_json_cached(sources_file)
+                )
+            })
+        
+        lemmas = read_json_cached(cache_file)
         
         lemma_data = lemmas.get(lemma_key)
         if not lemma_data:
@@ -400,6 +586,47 @@ def set_meaning(project_name):
     return jsonify({"status": "ok"})
 
 
+def get_batch_updates(data):
+    """Return the {lemma_key: value} dict of a batch payload, or None if invalid"""
+    updates = data.get("updates")
+    if not isinstance(updates, dict) or not updates:
+        return None
+    for lemma_key, value in updates.items():
+        if not lemma_key or not value or not isinstance(value, str):
+            return None
+    return updates
+
+
+@app.route("/project/<project_name>/set_naob_overrides", methods=["POST"])
+def set_naob_overrides(project_name):
+    """Batch version of set_naob_override: {"updates": {lemma_key: url, ...}}"""
+    project_path = os.path.join(PROJECTS_DIR, project_name)
+    if not os.path.exists(project_path):
+        return jsonify({"error": "Project not found"}), 404
+
+    updates = get_batch_updates(request.get_json() or {})
+    if updates is None:
+        return jsonify({"error": "Invalid payload"}), 400
+
+    save_naob_overrides(project_path, updates)
+    return jsonify({"status": "ok", "updated": len(updates)})
+
+
+@app.route("/project/<project_name>/set_meanings", methods=["POST"])
+def set_meanings(project_name):
+    """Batch version of set_meaning: {"updates": {lemma_key: meaning, ...}}"""
+    project_path = os.path.join(PROJECTS_DIR, project_name)
+    if not os.path.exists(project_path):
+        return jsonify({"error": "Project not found"}), 404
+
+    updates = get_batch_updates(request.get_json() or {})
+    if updates is None:
+        return jsonify({"error": "Invalid payload"}), 400
+
+    save_meanings(project_path, updates)
+    return jsonify({"status": "ok", "updated": len(updates)})
+
+
 @app.route("/project/<project_name>/update_segment", methods=["POST"])
 def update_segment(project_name):
     project_path = os.path.join(PROJECTS_DIR, project_name)
@@ -410,6 +637,33 @@ def update_segment(project_name):
     return jsonify({"status": "ok"})
 
 
+@functools.lru_cache(maxsize=4)
+def get_pos_groups_body(master_file, master_signature):
+    """
+    Serialized {pos: [lemmas by descending frequency]} for lemmas_master.json,
+    memoized per (mtime_ns, size, inode) signature so grouping and sorting run once per extraction.
+    POS keys are emitted sorted, matching what jsonify produced.
+    """
+    frequencies = read_json_cached(master_file)
+
+    pos_groups = {}
+    for key, data in frequencies.items():
+        lemma, pos = key.split("|", 1)
+        frequency = data.get("count", len(data.get("occurrences", [])))
+        
+        pos_groups.setdefault(pos, []).append({
+            "lemma_key": key,
+            "lemma": lemma,
+            "frequency": frequency
+        })
+    
+    for pos in pos_groups:
+        pos_groups[pos].sort(key=lambda x: x["frequency"], reverse=True)
+    
+    ordered = {pos: pos_groups[pos] for pos in sorted(pos_groups)}
+    return json.dumps(ordered, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
 @app.route("/project/<project_name>/lemma_frequencies")
 def lemma_frequencies(project_name):
     """Get lemma frequencies - ONLY if master cache already exists"""
@@ -422,35 +676,20 @@ def lemma_frequencies(project_name):
         return jsonify({"error": "Frequencies not extracted yet. Please extract first."}), 404
 
     try:
-        with open(master_file, "r", encoding="utf-8") as f:
-            frequencies = json.load(f)
+        st = os.stat(master_file)
+        pos_groups_body = get_pos_groups_body(master_file, (st.st_mtime_ns, st.st_size, st.st_ino))
     except Exception as e:
         return jsonify({"error": f"Failed to load frequencies: {str(e)}"}), 500
     
     suppressions = get_suppressions(project_path)
 
-    pos_groups = {}
-    for key, data in frequencies.items():
-        lemma = key.split("|")[0]
-        pos = key.split("|")[1]
-        frequency = data.get("count", len(data.get("occurrences", [])))
-        
-        if pos not in pos_groups:
-            pos_groups[pos] = []
-        
-        pos_groups[pos].append({
-            "lemma_key": key,
-            "lemma": lemma,
-            "frequency": frequency
-        })
-    
-    for pos in pos_groups:
-        pos_groups[pos].sort(key=lambda x: x["frequency"], reverse=True)
-    
-    return jsonify({
-        "pos_groups": pos_groups,
-        "suppressions": suppressions
-    })
+    # Splice the cached groups into the response instead of re-serializing them
+    body = b"".join((
+        b'{"pos_groups":', pos_groups_body,
+        b',"suppressions":', json.dumps(suppressions, ensure_ascii=False).encode("utf-8"),
+        b"}"
+    ))
+    return app.response_class(body, mimetype="application/json")
 
 
 @app.route("/project/<project_name>/extract_frequencies_stream")
@@ -508,6 +747,14 @@ def extract_frequencies_stream(project_name):
     return response
 
 
+def group_segments_by_file(segments, segment_files_map):
+    """Group segments by source file in one pass: {filename: [segments]}"""
+    by_file = {}
+    for s in segments:
+        by_file.setdefault(segment_files_map.get(s["id"]), []).append(s)
+    return by_file
+
+
 @app.route("/project/<project_name>/file_statistics")
 def get_file_statistics(project_name):
     """Get statistics for each source file"""
@@ -517,15 +764,16 @@ def get_file_statistics(project_name):
     
     try:
         # Load segments with targets
-        segments = tmx_processing.load_segments(project_path, include_tokens=True)
+        segments = tmx_processing.load_segments(project_path, include_tokens=False)
         segment_files_map = tmx_processing.get_segment_files_map(project_path)
         source_files = tmx_processing.get_source_files_list(project_path)
         
+        by_file = group_segments_by_file(segments, segment_files_map)
+        
         file_stats = []
         for source_file in source_files:
             # Get segments for this file
-            file_segment_ids = [seg_id for seg_id, file in segment_files_map.items() if file == source_file]
-            file_segments = [s for s in segments if s["id"] in file_segment_ids]
+            file_segments = by_file.get(source_file, [])
             
             # Count words in source text
             word_count = sum(len(s["source"].split()) for s in file_segments)
@@ -560,11 +808,12 @@ def export_file_to_docx(project_name, filename):
         from docx import Document
         from docx.shared import Pt, Cm, RGBColor
         from docx.enum.text import WD_ALIGN_PARAGRAPH
+        from docx.enum.style import WD_STYLE_TYPE
         from docx.oxml.ns import qn
         from docx.oxml import OxmlElement
         
         # Load segments with targets
-        segments = tmx_processing.load_segments(project_path, include_tokens=True)
+        segments = tmx_processing.load_segments(project_path, include_tokens=False)
         segment_files_map = tmx_processing.get_segment_files_map(project_path)
         source_files = tmx_processing.get_source_files_list(project_path)
         
@@ -575,13 +824,27 @@ def export_file_to_docx(project_name, filename):
             file_number = 1
         
         # Get segments for this file
-        file_segment_ids = [seg_id for seg_id, file in segment_files_map.items() if file == filename]
-        file_segments = [s for s in segments if s["id"] in file_segment_ids]
+        # Only one file is needed, so filter in one pass instead of grouping them all
+        file_segments = [s for s in segments if segment_files_map.get(s["id"]) == filename]
+        # The key is computed once per segment, and TMX order is already id order,
+        # so this is a linear pass that only guards against hand-edited files
         file_segments.sort(key=lambda x: int(x["id"]))
         
         # Create Word document
         doc = Document()
         
+        # Body formatting lives on styles, set once, instead of on every run and paragraph
+        normal = doc.styles['Normal']
+        normal.font.name = 'Times New Roman'
+        normal.font.size = Pt(12)
+        
+        body_style = doc.styles.add_style('Translation Body', WD_STYLE_TYPE.PARAGRAPH)
+        body_style.base_style = normal
+        body_style.paragraph_format.alignment = WD_ALIGN_PARAGRAPH.LEFT
+        body_style.paragraph_format.first_line_indent = Cm(0.5)
+        body_style.paragraph_format.space_after = Pt(12)
+        body_style.paragraph_format.line_spacing = 2.0
+        
         # Set A4 page size and margins (2.54cm = 1 inch)
         section = doc.sections[0]
         section.page_height = Cm(29.7)  # A4 height
@@ -632,40 +895,31 @@ def export_file_to_docx(project_name, filename):
         # Add chapter heading
         heading = doc.add_paragraph(str(file_number))
         heading.alignment = WD_ALIGN_PARAGRAPH.LEFT
-        heading_run = heading.runs[0]
-        heading_run.font.name = 'Times New Roman'
-        heading_run.font.size = Pt(12)
-        heading_run.font.bold = True
+        heading.runs[0].font.bold = True
         heading.paragraph_format.space_after = Pt(12)
         
         # Start first paragraph
-        p = doc.add_paragraph()
-        p.alignment = WD_ALIGN_PARAGRAPH.LEFT
-        p.paragraph_format.first_line_indent = Cm(0.5)
-        p.paragraph_format.space_after = Pt(12)
-        p.paragraph_format.line_spacing = 2.0
+        p = doc.add_paragraph(style=body_style)
         
-        # Add each segment to current paragraph
+        # Collect each paragraph's segments and write them as a single run
+        paragraph_texts = []
         for seg in file_segments:
             target_text = seg.get("target", "").strip()
             if target_text:
-                # Add text to current paragraph
-                run = p.add_run(target_text + " ")
-                run.font.name = 'Times New Roman'
-                run.font.size = Pt(12)
+                paragraph_texts.append(target_text + " ")
                 
                 # If this segment ends a paragraph, start a new one
                 if seg.get("is_paragraph_end", False):
-                    p = doc.add_paragraph()
-                    p.alignment = WD_ALIGN_PARAGRAPH.LEFT
-                    p.paragraph_format.first_line_indent = Cm(0.5)
-                    p.paragraph_format.space_after = Pt(12)
-                    p.paragraph_format.line_spacing = 2.0
+                    p.add_run("".join(paragraph_texts))
+                    paragraph_texts = []
+                    p = doc.add_paragraph(style=body_style)
+        
+        if paragraph_texts:
+            p.add_run("".join(paragraph_texts))
         
         # Save to exports folder
         exports_dir = os.path.join(project_path, "exports")
-        if not os.path.exists(exports_dir):
-            os.makedirs(exports_dir)
+        os.makedirs(exports_dir, exist_ok=True)
         
         # Generate output filename
         base_name = os.path.splitext(filename)[0]
@@ -730,6 +984,23 @@ def save_preference_route(project_name):
     return jsonify({"status": "ok"})
 
 
+def get_concordance_counts(project_path, cache_file):
+    """
+    (total_lemmas, with_concordances) for lemmas.json - from the meta sidecar
+    written at build time, or by scanning the cache if the sidecar is missing or stale
+    """
+    meta_file = tmx_processing.get_concordance_meta_file(project_path)
+    try:
+        if os.stat(meta_file).st_mtime_ns >= os.stat(cache_file).st_mtime_ns:
+            meta = read_json_file(meta_file)
+            return meta["total_lemmas"], meta["with_concordances"]
+    except (OSError, ValueError, KeyError):
+        pass
+    
+    lemmas = read_json_cached(cache_file)
+    return len(lemmas), sum(1 for v in lemmas.values() if v.get("occurrences"))
+
+
 @app.route("/project/<project_name>/concordance_status")
 def concordance_status(project_name):
     """Check if concordances have been built"""
@@ -747,11 +1018,7 @@ def concordance_status(project_name):
         })
     
     try:
-        with open(cache_file, "r", encoding="utf-8") as f:
-            lemmas = json.load(f)
-        
-        total_lemmas = len(lemmas)
-        with_concordances = sum(1 for v in lemmas.values() if v.get("occurrences"))
+        total_lemmas, with_concordances = get_concordance_counts(project_path, cache_file)
         
         timestamp = os.path.getmtime(cache_file)
         from datetime import datetime
@@ -782,11 +1049,7 @@ def build_concordances(project_name):
         tmx_processing.build_working_concordances(project_path, segments, suppressions)
         
         cache_file = tmx_processing.get_cache_file(project_path)
-        with open(cache_file, "r", encoding="utf-8") as f:
-            lemmas = json.load(f)
-        
-        total_lemmas = len(lemmas)
-        with_concordances = sum(1 for v in lemmas.values() if v.get("occurrences"))
+        total_lemmas, with_concordances = get_concordance_counts(project_path, cache_file)
         
         from datetime import datetime
         return jsonify({
@@ -832,11 +1095,7 @@ def build_concordances_stream(project_name):
                 yield progress_update
             
             cache_file = tmx_processing.get_cache_file(project_path)
-            with open(cache_file, "r", encoding="utf-8") as f:
-                lemmas = json.load(f)
-            
-            total_lemmas = len(lemmas)
-            with_concordances = sum(1 for v in lemmas.values() if v.get("occurrences"))
+            total_lemmas, with_concordances = get_concordance_counts(project_path, cache_file)
             
             from datetime import datetime
             yield f"data: {json.dumps({'status': 'complete', 'total_lemmas': total_lemmas, 'with_concordances': with_concordances, 'timestamp': datetime.utcnow().isoformat()})}\n\n"
@@ -1,29 +1,125 @@
 import os
+import re
+import sys
 import json
+import hashlib
+import threading
 import stanza
-import xml.etree.ElementTree as ET
+try:
+    # libxml2-backed; installed alongside python-docx
+    from lxml import etree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
 from collections import defaultdict
+from xml.sax.saxutils import escape, quoteattr
 from datetime import datetime
 
 # Version 1.11 - Store tokenized data in TMX as properties
 
-# Initialize Stanza pipeline for Norwegian Bokmål
-nlp = stanza.Pipeline(lang="nb", processors="tokenize,pos,lemma", use_gpu=False)
+# Per-project locks serializing every open of project.tmx and updates.log:
+# on Windows os.replace fails while another handle has the file open
+_tmx_locks = {}
+
+
+def tmx_lock(project_path):
+    """Lock to hold while reading, rewriting or copying a project's TMX or its updates.log"""
+    return _tmx_locks.setdefault(os.path.abspath(project_path), threading.RLock())
+
+
+# Set by every edit or TMX write, so the backup thread only wakes up after changes
+tmx_changed = threading.Event()
+
+# Parsed name of the xml:lang attribute on <tuv>
+XML_LANG = "{http://www.w3.org/XML/1998/namespace}lang"
+
+# Stanza pipelines for Norwegian Bokmål by processors string, each built on first use (see get_nlp)
+_nlp_pipelines = {}
+_nlp_lock = threading.Lock()
+
+# Full analysis, for tokens; sentence splitting alone only needs "tokenize"
+NLP_PROCESSORS = "tokenize,pos,lemma"
+
+
+def get_nlp(processors=NLP_PROCESSORS):
+    """
+    Return the shared Stanza pipeline for processors, loading the models on first call.
+    Importing this module stays cheap; routes that only read the TMX or the
+    caches never pay the model load. REUSE_RESOURCES skips the per-start
+    resources.json download once the models are on disk.
+    """
+    nlp = _nlp_pipelines.get(processors)
+    if nlp is None:
+        with _nlp_lock:
+            nlp = _nlp_pipelines.get(processors)
+            if nlp is None:
+                nlp = _nlp_pipelines[processors] = stanza.Pipeline(
+                    lang="nb",
+                    processors=processors,
+                    use_gpu=False,
+                    download_method=stanza.DownloadMethod.REUSE_RESOURCES,
+                )
+    return nlp
+
+
+# Texts per Stanza call: enough for Stanza's own length-sorted batching, while
+# only one chunk of (heavy) Documents is held at a time
+NLP_CHUNK_SIZE = 256
+
+
+def iter_nlp_docs(texts, processors=NLP_PROCESSORS):
+    """Run texts through Stanza in batched chunks, yielding one Document per text, in order"""
+    nlp = get_nlp(processors)
+    for start in range(0, len(texts), NLP_CHUNK_SIZE):
+        yield from nlp([stanza.Document([], text=text) for text in texts[start:start + NLP_CHUNK_SIZE]])
+
+
+# -----------------------
+# JSON cache helpers
+# -----------------------
+def read_json(path):
+    """Parse a JSON file from raw bytes - json decodes UTF-8 itself, skipping the text layer"""
+    with open(path, "rb") as f:
+        return json.loads(f.read())
+
+
+def write_json(path, data):
+    """
+    Write a rebuildable cache file as compact JSON.
+    These files are never hand-edited, so indentation only costs size and parse time.
+    Written next to the target and swapped in: readers never see a partial file,
+    and every version gets a new inode, which the parse caches key on.
+    """
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
 
 # -----------------------
 # TMX helpers
 # -----------------------
+TMX_HEADER = (
+    "<?xml version='1.0' encoding='utf-8'?>\n"
+    '<tmx version="1.4">\n'
+    '  <header creationtool="TranslationWorkbench" creationtoolversion="1.0" datatype="plaintext"'
+    ' segtype="sentence" adminlang="en-us" srclang="source" o-tmf="WorkbenchTMX" />\n'
+    "  <body>\n"
+)
+TMX_FOOTER = "  </body>\n</tmx>"
+PARAGRAPH_END_PROP = '      <prop type="paragraph-end">yes</prop>\n'
+
+
 def get_tmx_file(project_path):
     """
     Ensure TMX exists for the project; create it if missing.
     Returns path to project.tmx
     """
     tgt_dir = os.path.join(project_path, "target")
-    if not os.path.exists(tgt_dir):
-        os.makedirs(tgt_dir)
+    os.makedirs(tgt_dir, exist_ok=True)
     tmx_file = os.path.join(tgt_dir, "project.tmx")
-    if not os.path.exists(tmx_file):
-        export_project_to_tmx(project_path, output_file=tmx_file)
+    with tmx_lock(project_path):
+        if not os.path.exists(tmx_file):
+            export_project_to_tmx(project_path, output_file=tmx_file)
     return tmx_file
 
 
@@ -34,52 +130,46 @@ def export_project_to_tmx(project_path, output_file=None):
     segments = load_source_segments(project_path)
     if not output_file:
         tgt_dir = os.path.join(project_path, "target")
-        if not os.path.exists(tgt_dir):
-            os.makedirs(tgt_dir)
+        os.makedirs(tgt_dir, exist_ok=True)
         output_file = os.path.join(tgt_dir, "project.tmx")
 
-    tmx = ET.Element("tmx", version="1.4")
-    ET.SubElement(tmx, "header", {
-        "creationtool": "TranslationWorkbench",
-        "creationtoolversion": "1.0",
-        "datatype": "plaintext",
-        "segtype": "sentence",
-        "adminlang": "en-us",
-        "srclang": "source",
-        "o-tmf": "WorkbenchTMX"
-    })
-    body = ET.SubElement(tmx, "body")
-
     # V1.2: Build segment-to-file mapping
     segment_map = {}
 
+    # The layout is fixed, so format it directly (same indented form ET.indent
+    # produced) instead of building an Element tree of 5 nodes per segment,
+    # then write the whole document with a single write call
+    parts = [TMX_HEADER]
     for i, seg in enumerate(segments, start=1):
-        tu = ET.SubElement(body, "tu", {
-            "tuid": str(i),
-            "last_updated": seg["last_updated"]
-        })
-        if seg.get("is_paragraph_end"):
-            ET.SubElement(tu, "prop", {"type": "paragraph-end"}).text = "yes"
-        tuv_src = ET.SubElement(tu, "tuv", {"xml:lang": "source"})
-        ET.SubElement(tuv_src, "seg").text = seg.get("source", "")
-        tuv_tgt = ET.SubElement(tu, "tuv", {"xml:lang": "target"})
-        ET.SubElement(tuv_tgt, "seg").text = seg.get("target", "")
-        
+        paragraph_end = PARAGRAPH_END_PROP if seg.get("is_paragraph_end") else ""
+        parts.append(
+            f'    <tu tuid="{i}" last_updated={quoteattr(seg["last_updated"])}>\n'
+            f"{paragraph_end}"
+            f'      <tuv xml:lang="source">\n'
+            f"        <seg>{escape(seg.get('source', ''))}</seg>\n"
+            f"      </tuv>\n"
+            f'      <tuv xml:lang="target">\n'
+            f"        <seg>{escape(seg.get('target', ''))}</seg>\n"
+            f"      </tuv>\n"
+            f"    </tu>\n"
+        )
+
         # V1.2: Map segment ID to source file
         if "source_file" in seg:
             segment_map[str(i)] = seg["source_file"]
+    parts.append(TMX_FOOTER)
 
-    tree = ET.ElementTree(tmx)
-    ET.indent(tree, space="  ", level=0)
-    tree.write(output_file, encoding="utf-8", xml_declaration=True)
+    with open(output_file, "wb") as f:
+        f.write("".join(parts).encode("utf-8"))
+    invalidate_segments_cache(output_file)
+    tmx_changed.set()
     
     # V1.2: Save segment-to-file mapping
     cache_dir = os.path.join(project_path, "cache")
-    if not os.path.exists(cache_dir):
-        os.makedirs(cache_dir)
+    os.makedirs(cache_dir, exist_ok=True)
     mapping_file = os.path.join(cache_dir, "segment_files.json")
-    with open(mapping_file, "w", encoding="utf-8") as f:
-        json.dump(segment_map, f, ensure_ascii=False, indent=2)
+    write_json(mapping_file, segment_map)
+    _segment_files_cache.pop(mapping_file, None)
     
     print(f"TMX exported to {output_file}")
     print(f"Segment mapping saved to {mapping_file}")
@@ -97,9 +187,8 @@ def load_source_segments(project_path):
     if not os.path.exists(src_dir):
         return []
 
-    segments = []
-    seg_id_counter = 1
-
+    # Collect every paragraph first so Stanza runs batched over all files
+    paragraphs = []
     for fname in sorted(os.listdir(src_dir)):
         if not fname.lower().endswith(".txt"):
             continue
@@ -107,19 +196,37 @@ def load_source_segments(project_path):
         with open(path, "r", encoding="utf-8") as f:
             text = f.read()
 
-        paragraphs = [p for p in text.split("\n\n") if p.strip()]
-        for para in paragraphs:
-            doc = nlp(para)
-            for i, sentence in enumerate(doc.sentences):
-                segments.append({
-                    "id": str(seg_id_counter),
-                    "source": sentence.text.strip(),
-                    "target": "",
-                    "is_paragraph_end": i == len(doc.sentences) - 1,
-                    "last_updated": datetime.utcnow().isoformat(),
-                    "source_file": fname
-                })
-                seg_id_counter += 1
+        paragraphs.extend((fname, p) for p in text.split("\n\n") if p.strip())
+
+    if not paragraphs:
+        return []
+
+    # Repeated paragraphs (headings, boilerplate) are segmented once; only
+    # the sentence texts are kept, not the Stanza documents. Splitting needs
+    # the tokenizer alone - tokens are built later, by the full pipeline
+    unique_paragraphs = list(dict.fromkeys(para for _, para in paragraphs))
+    sentences_by_paragraph = {
+        para: [sentence.text.strip() for sentence in doc.sentences]
+        for para, doc in zip(unique_paragraphs, iter_nlp_docs(unique_paragraphs, processors="tokenize"))
+    }
+
+    segments = []
+    seg_id_counter = 1
+    # All segments of one export are created together; format the time once
+    created = datetime.utcnow().isoformat()
+
+    for fname, para in paragraphs:
+        sentences = sentences_by_paragraph[para]
+        for i, sentence in enumerate(sentences):
+            segments.append({
+                "id": str(seg_id_counter),
+                "source": sentence,
+                "target": "",
+                "is_paragraph_end": i == len(sentences) - 1,
+                "last_updated": created,
+                "source_file": fname
+            })
+            seg_id_counter += 1
 
     return segments
 
@@ -127,32 +234,81 @@ def load_source_segments(project_path):
 # -----------------------
 # V1.11: Load segments with tokens from TMX
 # -----------------------
+# (tmx_file, include_tokens) -> ((mtime_ns, size, inode), parsed segments)
+_segments_cache = {}
+
+
+def invalidate_segments_cache(tmx_file):
+    """Drop parsed segments for a TMX we just wrote, even if its mtime and size look unchanged"""
+    _segments_cache.pop((tmx_file, True), None)
+    _segments_cache.pop((tmx_file, False), None)
+
+
 def load_segments(project_path, include_tokens=True):
     """
     Returns list of segments with 'id', 'source', 'target', 'last_updated', 'is_paragraph_end'
     V1.11: Optionally includes 'tokens' if stored in TMX
+    The parse is reused until the TMX changes, so the segment dicts are shared -
+    callers must not modify them.
+    Pending target edits in updates.log are applied to the result; the files
+    themselves are only rewritten by compact_tmx().
     """
-    segments = []
-
     tmx_file = get_tmx_file(project_path)
 
-    tree = ET.parse(tmx_file)
-    root = tree.getroot()
-    body = root.find("body")
+    with tmx_lock(project_path):
+        st = os.stat(tmx_file)
+        signature = (st.st_mtime_ns, st.st_size, st.st_ino)
+        cache_key = (tmx_file, include_tokens)
+        cached = _segments_cache.get(cache_key)
+        if cached and cached[0] == signature:
+            segments = cached[1]
+        else:
+            segments = parse_segments(tmx_file, include_tokens)
+            _segments_cache[cache_key] = (signature, segments)
+        updates = read_updates_log(get_updates_log_file(project_path))
+
+    if not updates:
+        return list(segments)
+    # Copies for edited segments, so the cached parse stays as on disk
+    return [
+        dict(seg, target=updates[seg["id"]][0].strip(), last_updated=updates[seg["id"]][1])
+        if seg["id"] in updates else seg
+        for seg in segments
+    ]
+
 
-    # Namespace mapping for xml:lang
-    namespaces = {"xml": "http://www.w3.org/XML/1998/namespace"}
+def parse_segments(tmx_file, include_tokens=True):
+    """Parse every <tu> of a TMX file into a segment dict (see load_segments)"""
+    segments = []
+
+    # Stream the TMX one <tu> at a time instead of building the whole tree;
+    # each unit is cleared once read, so memory stays flat
+    for _, tu in ET.iterparse(tmx_file, events=("end",)):
+        if tu.tag != "tu":
+            continue
 
-    for tu in body.findall("tu"):
         tuid = tu.attrib.get("tuid")
         last_updated = tu.attrib.get("last_updated")
-        is_paragraph_end = False
-        prop = tu.find("prop[@type='paragraph-end']")
-        if prop is not None and prop.text == "yes":
-            is_paragraph_end = True
+        is_paragraph_end = None
+        src_seg = tgt_seg = tokens_prop = None
+
+        # One pass over the children, checking attributes directly instead of
+        # running an XPath find() per field. First match wins, as with find().
+        for child in tu:
+            if child.tag == "tuv":
+                lang = child.get(XML_LANG)
+                if lang == "source" and src_seg is None:
+                    src_seg = child
+                elif lang == "target" and tgt_seg is None:
+                    tgt_seg = child
+            elif child.tag == "prop":
+                prop_type = child.get("type")
+                if prop_type == "paragraph-end" and is_paragraph_end is None:
+                    is_paragraph_end = child.text == "yes"
+                elif prop_type == "tokens" and tokens_prop is None:
+                    tokens_prop = child
 
         # Source text
-        src_seg = tu.find("./tuv[@xml:lang='source']", namespaces=namespaces)
         src_text = ""
         if src_seg is not None:
             seg_elem = src_seg.find("seg")
@@ -160,7 +316,6 @@ def load_segments(project_path, include_tokens=True):
                 src_text = seg_elem.text.strip()
 
         # Target text
-        tgt_seg = tu.find("./tuv[@xml:lang='target']", namespaces=namespaces)
         tgt_text = ""
         if tgt_seg is not None:
             seg_elem = tgt_seg.find("seg")
@@ -172,22 +327,27 @@ def load_segments(project_path, include_tokens=True):
             "source": src_text,
             "target": tgt_text,
             "last_updated": last_updated,
-            "is_paragraph_end": is_paragraph_end
+            "is_paragraph_end": bool(is_paragraph_end)
         }
 
         # V1.11: Load tokens from TMX if requested and available
         if include_tokens:
-            tokens_prop = tu.find("prop[@type='tokens']")
             if tokens_prop is not None and tokens_prop.text:
                 try:
-                    segment["tokens"] = json.loads(tokens_prop.text)
-                except json.JSONDecodeError:
+                    segment["tokens"] = intern_tokens(json.loads(tokens_prop.text))
+                except (ValueError, KeyError, TypeError):
                     # If tokens are malformed, we'll need to re-tokenize
                     segment["tokens"] = None
             else:
                 segment["tokens"] = None
 
         segments.append(segment)
+        tu.clear()
+        # lxml keeps the cleared <tu> shells attached to <body>; drop the ones
+        # already read (lxml's "fast iter" pattern - stdlib elements lack getprevious)
+        if hasattr(tu, "getprevious"):
+            while tu.getprevious() is not None:
+                del tu.getparent()[0]
 
     return segments
 
@@ -199,48 +359,171 @@ def save_tokens_to_tmx(project_path, segment_id, tokens):
     """
     Save tokenized data for a segment to TMX as a property
     """
+    save_all_tokens_to_tmx(project_path, {segment_id: tokens})
+
+
+def save_all_tokens_to_tmx(project_path, tokens_by_segid):
+    """
+    Save tokenized data for many segments ({segment_id: tokens}) to TMX with
+    one parse and one write, instead of one of each per segment.
+    Unchanged token props are left alone; if none changed, nothing is written.
+    Pending edits in updates.log are folded in by the same write.
+    """
+    if not tokens_by_segid:
+        return
+
     tmx_file = get_tmx_file(project_path)
-    tree = ET.parse(tmx_file)
-    root = tree.getroot()
-    body = root.find("body")
+    log_file = get_updates_log_file(project_path)
+    with tmx_lock(project_path):
+        updates = read_updates_log(log_file)
+        tree = ET.parse(tmx_file)
+        body = tree.getroot().find("body")
 
-    for tu in body.findall("tu"):
-        tuid = tu.attrib.get("tuid")
-        if segment_id == tuid:
-            # Remove existing tokens prop if present
-            existing_tokens = tu.find("prop[@type='tokens']")
-            if existing_tokens is not None:
-                tu.remove(existing_tokens)
-            
-            # Add new tokens prop
-            tokens_prop = ET.SubElement(tu, "prop", {"type": "tokens"})
-            tokens_prop.text = json.dumps(tokens, ensure_ascii=False)
-            break
+        changed = bool(updates)
+        if updates:
+            apply_target_updates(body, updates)
+        for tu in body.iterfind("tu"):
+            tokens = tokens_by_segid.get(tu.attrib.get("tuid"))
+            if tokens is None:
+                continue
+            # Compact like the JSON caches: token props are most of the TMX's size
+            tokens_text = json.dumps(tokens, ensure_ascii=False, separators=(",", ":"))
+            tokens_prop = next((prop for prop in tu.iterfind("prop") if prop.get("type") == "tokens"), None)
+            if tokens_prop is None:
+                tokens_prop = ET.SubElement(tu, "prop", {"type": "tokens"})
+            elif tokens_prop.text == tokens_text:
+                continue
+            tokens_prop.text = tokens_text
+            changed = True
+
+        if changed:
+            # Write next to the TMX and swap it in, so a crash mid-write can't truncate the translation
+            tmp_file = tmx_file + ".tmp"
+            tree.write(tmp_file, encoding="utf-8", xml_declaration=True, method="xml")
+            os.replace(tmp_file, tmx_file)
+            invalidate_segments_cache(tmx_file)
+            tmx_changed.set()
+        if updates is not None:
+            os.remove(log_file)
+
+
+# -----------------------
+# Token cache helpers
+# -----------------------
+def get_tokens_cache_file(project_path):
+    cache_dir = os.path.join(project_path, "cache")
+    os.makedirs(cache_dir, exist_ok=True)
+    return os.path.join(cache_dir, "tokens.json")
+
+
+def get_source_hash(source_text):
+    """Key for the tokens cache: hash of the source string"""
+    return hashlib.blake2b(source_text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def load_tokens_cache(project_path):
+    """Load the source-hash -> tokens cache, or an empty dict"""
+    tokens_file = get_tokens_cache_file(project_path)
+    if not os.path.exists(tokens_file):
+        return {}
+
+    try:
+        tokens_cache = read_json(tokens_file)
+        for tokens in tokens_cache.values():
+            intern_tokens(tokens)
+        return tokens_cache
+    except Exception:
+        return {}
+
+
+def save_tokens_cache(project_path, tokens_cache):
+    tokens_file = get_tokens_cache_file(project_path)
+    write_json(tokens_file, tokens_cache)
+
+
+# -----------------------
+# Stanza tokenization
+# -----------------------
+def doc_to_tokens(doc):
+    """
+    Flatten a Stanza document into a list of text/lemma/pos dicts.
+    Lemmas are stored stripped and lowercased.
+    Lemma and POS strings are interned: they repeat across thousands of tokens.
+    """
+    return [
+        {"text": token.text, "lemma": sys.intern(token.lemma.strip().lower()), "pos": sys.intern(token.upos)}
+        for sent in doc.sentences
+        for token in sent.words
+    ]
+
+
+def intern_tokens(tokens):
+    """
+    Intern lemma/POS strings of tokens decoded from JSON, in place, so
+    cached token lists share one object per value like doc_to_tokens output.
+    """
+    for token in tokens:
+        token["lemma"] = sys.intern(token["lemma"])
+        token["pos"] = sys.intern(token["pos"])
+    return tokens
 
-    tree.write(tmx_file, encoding="utf-8", xml_declaration=True, method="xml")
+
+def seed_tokens_cache_from_tmx(project_path, tokens_cache):
+    """
+    Copy tokens already stored in the TMX into tokens_cache, so projects
+    tokenized before tokens.json existed never go back through Stanza.
+    The source hash is the per-segment key: unchanged text, unchanged tokens.
+    """
+    for seg in load_segments(project_path, include_tokens=True):
+        if seg["tokens"]:
+            tokens_cache.setdefault(get_source_hash(seg["source"]), seg["tokens"])
+
+
+def fill_tokens_cache(segments, tokens_cache):
+    """
+    Tokenize every segment whose source is not yet in tokens_cache.
+    All misses go through Stanza in batched calls (see iter_nlp_docs).
+    """
+    missing = {}
+    for seg in segments:
+        key = get_source_hash(seg["source"])
+        if key not in tokens_cache:
+            missing[key] = seg["source"]
+
+    if not missing:
+        return
+
+    docs = iter_nlp_docs(list(missing.values()))
+    for key, doc in zip(missing.keys(), docs):
+        tokens_cache[key] = doc_to_tokens(doc)
 
 
 # -----------------------
 # V1.11: Tokenize segment and save to TMX
 # -----------------------
-def tokenize_and_store_segment(project_path, segment_id, source_text):
+def tokenize_segment(source_text, tokens_cache=None):
+    """
+    Tokenize a source segment.
+    If tokens_cache is given, Stanza only runs for source text not already in it.
+    """
+    key = get_source_hash(source_text)
+    tokens = tokens_cache.get(key) if tokens_cache is not None else None
+
+    if tokens is None:
+        tokens = doc_to_tokens(get_nlp()(source_text))
+        if tokens_cache is not None:
+            tokens_cache[key] = tokens
+    return tokens
+
+
+def tokenize_and_store_segment(project_path, segment_id, source_text, tokens_cache=None):
     """
     Tokenize a source segment and store tokens in TMX.
+    For many segments, use tokenize_segment and one save_all_tokens_to_tmx instead.
     Returns the tokens.
     """
-    tokens = []
-    doc = nlp(source_text)
-    for sent in doc.sentences:
-        for token in sent.words:
-            tokens.append({
-                "text": token.text,
-                "lemma": token.lemma.lower(),
-                "pos": token.upos
-            })
-    
-    # Save to TMX
+    tokens = tokenize_segment(source_text, tokens_cache)
     save_tokens_to_tmx(project_path, segment_id, tokens)
-    
     return tokens
 
 
@@ -249,41 +532,119 @@ def tokenize_and_store_segment(project_path, segment_id, source_text):
 # -----------------------
 def get_cache_file(project_path):
     cache_dir = os.path.join(project_path, "cache")
-    if not os.path.exists(cache_dir):
-        os.makedirs(cache_dir)
+    os.makedirs(cache_dir, exist_ok=True)
     return os.path.join(cache_dir, "lemmas.json")
 
 
 def get_master_cache_file(project_path):
     cache_dir = os.path.join(project_path, "cache")
-    if not os.path.exists(cache_dir):
-        os.makedirs(cache_dir)
+    os.makedirs(cache_dir, exist_ok=True)
     return os.path.join(cache_dir, "lemmas_master.json")
 
 
+def get_concordance_index_files(project_path):
+    """Returns (index_file, data_file, sources_file) for the per-lemma concordance index"""
+    cache_dir = os.path.join(project_path, "cache")
+    os.makedirs(cache_dir, exist_ok=True)
+    return (
+        os.path.join(cache_dir, "lemmas.index.json"),
+        os.path.join(cache_dir, "lemmas.dat"),
+        os.path.join(cache_dir, "lemmas.sources.json"),
+    )
+
+
+def write_concordance_index(project_path, working_lemmas):
+    """
+    Write each lemma's occurrences as its own JSON blob in lemmas.dat, and
+    lemmas.index.json as {lemma_key: [offset, length]} into it, so a single
+    lemma's concordances can be read without parsing all of lemmas.json.
+    Blobs hold segment ids only; each source sentence is stored once, in
+    lemmas.sources.json, instead of once per lemma that occurs in it.
+    Written after lemmas.json - an index older than lemmas.json is stale.
+    """
+    index_file, data_file, sources_file = get_concordance_index_files(project_path)
+    index = {}
+    sources = {}
+    offset = 0
+    with open(data_file, "wb") as f:
+        for key, data in working_lemmas.items():
+            segment_ids = []
+            for occ in data["occurrences"]:
+                segment_ids.append(occ["segment_id"])
+                sources[occ["segment_id"]] = occ["source_segment"]
+            blob = json.dumps(segment_ids, separators=(",", ":")).encode("utf-8")
+            f.write(blob)
+            index[key] = [offset, len(blob)]
+            offset += len(blob)
+    write_json(sources_file, sources)
+    write_json(index_file, index)
+
+
+def read_lemma_occurrences(data_file, span, sources):
+    """
+    Read one lemma's occurrences from lemmas.dat given its [offset, length]
+    index entry, resolving segment ids against the lemmas.sources.json pool
+    """
+    offset, length = span
+    with open(data_file, "rb") as f:
+        f.seek(offset)
+        segment_ids = json.loads(f.read(length))
+    return [{"segment_id": seg_id, "source_segment": sources[seg_id]} for seg_id in segment_ids]
+
+
+def get_concordance_meta_file(project_path):
+    cache_dir = os.path.join(project_path, "cache")
+    os.makedirs(cache_dir, exist_ok=True)
+    return os.path.join(cache_dir, "lemmas.meta.json")
+
+
+def write_concordance_meta(project_path, working_lemmas):
+    """Store lemmas.json's counts so status checks don't have to parse and scan it"""
+    write_json(get_concordance_meta_file(project_path), {
+        "total_lemmas": len(working_lemmas),
+        "with_concordances": sum(1 for v in working_lemmas.values() if v["occurrences"])
+    })
+
+
 # -----------------------
 # V1.2: Segment-to-file mapping helper
 # -----------------------
-def get_segment_files_map(project_path):
-    """Load the mapping of segment IDs to source files"""
-    cache_dir = os.path.join(project_path, "cache")
-    mapping_file = os.path.join(cache_dir, "segment_files.json")
-    
-    if not os.path.exists(mapping_file):
-        return {}
-    
+# mapping_file -> ((mtime_ns, size, inode), segment map, sorted source files)
+_segment_files_cache = {}
+
+
+def _load_segment_files(project_path):
+    """Parse segment_files.json once per change; returns (mapping, sorted source files)"""
+    mapping_file = os.path.join(project_path, "cache", "segment_files.json")
+    try:
+        st = os.stat(mapping_file)
+    except FileNotFoundError:
+        return {}, []
+
+    # The inode catches a same-size rewrite within one mtime tick (write_json replaces the file)
+    signature = (st.st_mtime_ns, st.st_size, st.st_ino)
+    cached = _segment_files_cache.get(mapping_file)
+    if cached and cached[0] == signature:
+        return cached[1], cached[2]
+
     try:
-        with open(mapping_file, "r", encoding="utf-8") as f:
-            return json.load(f)
+        mapping = read_json(mapping_file)
     except Exception:
-        return {}
+        return {}, []
+
+    files = sorted(set(mapping.values()))
+    _segment_files_cache[mapping_file] = (signature, mapping, files)
+    return mapping, files
+
+
+def get_segment_files_map(project_path):
+    """Load the mapping of segment IDs to source files (shared - do not modify)"""
+    return _load_segment_files(project_path)[0]
 
 
 def get_source_files_list(project_path):
     """Get list of unique source files from the mapping"""
-    mapping = get_segment_files_map(project_path)
-    files = sorted(set(mapping.values()))
-    return files
+    return list(_load_segment_files(project_path)[1])
 
 
 # -----------------------
@@ -293,6 +654,9 @@ def extract_lemma_frequencies_generator(segments, project_path=None, progress_ca
     """
     Generator version that yields SSE messages for frequency extraction.
     This is the version that should be used with SSE endpoints.
+    progress_callback(current, total, message, file_name) must itself be a
+    generator of SSE frames; every frame it yields is passed straight through.
+    The generator's return value is the frequency data (see extract_lemma_frequencies).
     V1.11: Also tokenizes and stores to TMX
     """
     master_cache_file = get_master_cache_file(project_path) if project_path else None
@@ -300,82 +664,82 @@ def extract_lemma_frequencies_generator(segments, project_path=None, progress_ca
     # Check if master cache already exists
     if master_cache_file and os.path.exists(master_cache_file):
         try:
-            with open(master_cache_file, "r", encoding="utf-8") as f:
-                cached = json.load(f)
+            cached = read_json(master_cache_file)
             # Send completion message
             if progress_callback:
                 for msg in progress_callback(1, 1, "Using cached frequencies", None):
                     yield msg
-            return
+            return cached
         except Exception:
             pass
     
     frequencies = defaultdict(lambda: {"wordforms": set(), "count": 0})
+    tokens_by_segid = {}
+    tokens_cache = load_tokens_cache(project_path) if project_path else None
+    if tokens_cache is not None:
+        seed_tokens_cache_from_tmx(project_path, tokens_cache)
     
-    # Group segments by source file for progress reporting
+    # Group segments by source file for progress reporting; without it, one batch
     if project_path and progress_callback:
         segment_files_map = get_segment_files_map(project_path)
         files_segments = defaultdict(list)
         for seg in segments:
             source_file = segment_files_map.get(seg["id"], "unknown")
             files_segments[source_file].append(seg)
-        
-        sorted_files = sorted(files_segments.keys())
-        total_files = len(sorted_files)
-        
-        for file_idx, source_file in enumerate(sorted_files):
+        batches = [(source_file, files_segments[source_file]) for source_file in sorted(files_segments)]
+    else:
+        batches = [(None, segments)]
+    total_files = len(batches)
+
+    for file_idx, (source_file, file_segments) in enumerate(batches):
+        if source_file is not None:
             # Yield progress update
             for msg in progress_callback(file_idx + 1, total_files, f"Processing source file: {source_file}", source_file):
                 yield msg
-            
-            file_segments = files_segments[source_file]
-            for seg in file_segments:
-                # V1.11: Tokenize and save to TMX
-                tokens = tokenize_and_store_segment(project_path, seg["id"], seg["source"])
-                
-                # Extract frequencies from tokens
-                for token in tokens:
-                    if not token["text"].isalpha():
-                        continue
-                    lemma = token["lemma"].strip().lower()
-                    pos = token["pos"]
-                    if not lemma:
-                        continue
-                    key = f"{lemma}|{pos}"
-                    frequencies[key]["wordforms"].add(token["text"].lower())
-                    frequencies[key]["count"] += 1
-    else:
-        # No progress reporting - process all at once
-        for seg in segments:
-            # V1.11: Tokenize and save to TMX
-            tokens = tokenize_and_store_segment(project_path, seg["id"], seg["source"])
-            
+
+        if tokens_cache is not None:
+            fill_tokens_cache(file_segments, tokens_cache)
+        for seg in file_segments:
+            # V1.11: Tokenize; tokens are saved to TMX in one write at the end
+            tokens = tokenize_segment(seg["source"], tokens_cache)
+            tokens_by_segid[seg["id"]] = tokens
+
             # Extract frequencies from tokens
             for token in tokens:
-                if not token["text"].isalpha():
+                text = token["text"]
+                if not text.isalpha():
                     continue
+                # Tokens saved before doc_to_tokens normalized lemmas may hold unstripped ones
                 lemma = token["lemma"].strip().lower()
-                pos = token["pos"]
                 if not lemma:
                     continue
+                pos = token["pos"]
                 key = f"{lemma}|{pos}"
-                frequencies[key]["wordforms"].add(token["text"].lower())
-                frequencies[key]["count"] += 1
+                entry = frequencies[key]
+                entry["wordforms"].add(text.lower())
+                entry["count"] += 1
+
+    if project_path:
+        save_all_tokens_to_tmx(project_path, tokens_by_segid)
+    if tokens_cache is not None:
+        save_tokens_cache(project_path, tokens_cache)
+
+    # Same shape as lemmas_master.json, so fresh and cached results match
+    to_save = {}
+    for k, v in frequencies.items():
+        to_save[k] = {
+            "wordforms": sorted(v["wordforms"]),
+            "count": v["count"]
+        }
 
     # Save to lemmas_master.json (frequencies only)
     if master_cache_file:
         if progress_callback:
-            for msg in progress_callback(total_files if project_path else 1, total_files if project_path else 1, "Saving frequency data...", None):
+            for msg in progress_callback(total_files, total_files, "Saving frequency data...", None):
                 yield msg
-        
-        to_save = {}
-        for k, v in frequencies.items():
-            to_save[k] = {
-                "wordforms": list(v["wordforms"]),
-                "count": v["count"]
-            }
-        with open(master_cache_file, "w", encoding="utf-8") as f:
-            json.dump(to_save, f, ensure_ascii=False, indent=2)
+        write_json(master_cache_file, to_save)
+
+    return to_save
 
 
 # -----------------------
@@ -385,88 +749,21 @@ def extract_lemma_frequencies(segments, project_path=None, progress_callback=Non
     """
     LEGACY: Extract lemma frequencies only - no occurrence data.
     This version doesn't support SSE properly. Use extract_lemma_frequencies_generator for SSE.
+    Runs the generator to completion, calling progress_callback directly.
+    Returns {lemma|pos: {"wordforms", "count"}} with wordforms as sorted lists,
+    as stored in lemmas_master.json.
     V1.11: Also tokenizes and stores to TMX
     """
-    master_cache_file = get_master_cache_file(project_path) if project_path else None
-    
-    # Check if master cache already exists
-    if master_cache_file and os.path.exists(master_cache_file):
-        try:
-            with open(master_cache_file, "r", encoding="utf-8") as f:
-                cached = json.load(f)
-            # Convert wordforms back to sets for consistency
-            for k, v in cached.items():
-                v["wordforms"] = set(v["wordforms"])
-            return cached
-        except Exception:
-            pass
-    
-    frequencies = defaultdict(lambda: {"wordforms": set(), "count": 0})
-    
-    # Group segments by source file for progress reporting
-    if project_path and progress_callback:
-        segment_files_map = get_segment_files_map(project_path)
-        files_segments = defaultdict(list)
-        for seg in segments:
-            source_file = segment_files_map.get(seg["id"], "unknown")
-            files_segments[source_file].append(seg)
-        
-        sorted_files = sorted(files_segments.keys())
-        total_files = len(sorted_files)
-        
-        for file_idx, source_file in enumerate(sorted_files):
-            if progress_callback:
-                progress_callback(file_idx + 1, total_files, f"Processing source file: {source_file}", source_file)
-            
-            file_segments = files_segments[source_file]
-            for seg in file_segments:
-                # V1.11: Tokenize and save to TMX
-                tokens = tokenize_and_store_segment(project_path, seg["id"], seg["source"])
-                
-                # Extract frequencies from tokens
-                for token in tokens:
-                    if not token["text"].isalpha():
-                        continue
-                    lemma = token["lemma"].strip().lower()
-                    pos = token["upos"]
-                    if not lemma:
-                        continue
-                    key = f"{lemma}|{pos}"
-                    frequencies[key]["wordforms"].add(token["text"].lower())
-                    frequencies[key]["count"] += 1
-    else:
-        # No progress reporting - process all at once
-        for seg in segments:
-            # V1.11: Tokenize and save to TMX
-            tokens = tokenize_and_store_segment(project_path, seg["id"], seg["source"])
-            
-            # Extract frequencies from tokens
-            for token in tokens:
-                if not token["text"].isalpha():
-                    continue
-                lemma = token["lemma"].strip().lower()
-                pos = token["pos"]
-                if not lemma:
-                    continue
-                key = f"{lemma}|{pos}"
-                frequencies[key]["wordforms"].add(token["text"].lower())
-                frequencies[key]["count"] += 1
+    def emit(current, total, message, file_name):
+        progress_callback(current, total, message, file_name)
+        return ()
 
-    # Save to lemmas_master.json (frequencies only)
-    if master_cache_file:
-        if progress_callback:
-            progress_callback(total_files if project_path else 1, total_files if project_path else 1, "Saving frequency data...", None)
-        
-        to_save = {}
-        for k, v in frequencies.items():
-            to_save[k] = {
-                "wordforms": list(v["wordforms"]),
-                "count": v["count"]
-            }
-        with open(master_cache_file, "w", encoding="utf-8") as f:
-            json.dump(to_save, f, ensure_ascii=False, indent=2)
-
-    return frequencies
+    frames = extract_lemma_frequencies_generator(segments, project_path, emit if progress_callback else None)
+    while True:
+        try:
+            next(frames)
+        except StopIteration as done:
+            return done.value
 
 
 # -----------------------
@@ -476,6 +773,8 @@ def build_working_concordances_generator(project_path, segments, suppressions, p
     """
     Generator version that yields SSE messages for concordance building.
     This is the version that should be used with SSE endpoints.
+    progress_callback(current, total, message, file_name) must itself be a
+    generator of SSE frames; every frame it yields is passed straight through.
     V1.11: Uses tokens from TMX if available
     """
     master_file = get_master_cache_file(project_path)
@@ -486,14 +785,26 @@ def build_working_concordances_generator(project_path, segments, suppressions, p
         for msg in extract_lemma_frequencies_generator(segments, project_path, progress_callback):
             yield msg
     
-    with open(master_file, "r", encoding="utf-8") as f:
-        frequencies = json.load(f)
+    frequencies = read_json(master_file)
+    # Sets, not the stored lists: membership is tested for every token
+    suppressed_lemmas = frozenset(suppressions.get("lemmas", []))
+    suppressed_pos = frozenset(suppressions.get("pos", []))
     
     # V1.11: Load segments with tokens from TMX
     segments_with_tokens = load_segments(project_path, include_tokens=True)
+
+    # Segments the TMX has no tokens for yet go through Stanza together, up front
+    tokens_cache = None
+    tokens_by_segid = {}
+    untokenized = [seg for seg in segments_with_tokens if not seg.get("tokens")]
+    if untokenized:
+        tokens_cache = load_tokens_cache(project_path)
+        fill_tokens_cache(untokenized, tokens_cache)
     
     # Build concordances only for non-suppressed lemmas
-    lemmas = defaultdict(lambda: {"wordforms": set(), "occurrences": []})
+    # Occurrences are collected column-wise as segment ids only; the
+    # {segment_id, source_segment} dicts are built once, when writing the cache
+    lemmas = defaultdict(lambda: {"wordforms": set(), "segment_ids": []})
     total_segments = len(segments_with_tokens)
     
     # Report progress every 10 segments to avoid overwhelming the connection
@@ -508,43 +819,51 @@ def build_working_concordances_generator(project_path, segments, suppressions, p
         if seg.get("tokens"):
             tokens = seg["tokens"]
         else:
-            # Fallback: tokenize if not in TMX yet
-            tokens = tokenize_and_store_segment(project_path, seg["id"], seg["source"])
+            # Fallback: not in TMX yet (already tokenized into tokens_cache above)
+            tokens = tokenize_segment(seg["source"], tokens_cache)
+            tokens_by_segid[seg["id"]] = tokens
         
         # Process tokens to build concordances
         for token in tokens:
-            if not token["text"].isalpha():
+            text = token["text"]
+            if not text.isalpha():
                 continue
+            # Tokens saved before doc_to_tokens normalized lemmas may hold unstripped ones
             lemma = token["lemma"].strip().lower()
-            pos = token["pos"]
             if not lemma:
                 continue
+            pos = token["pos"]
             key = f"{lemma}|{pos}"
             
             # Skip suppressed lemmas/POS
-            if key in suppressions.get("lemmas", []) or pos in suppressions.get("pos", []):
+            if key in suppressed_lemmas or pos in suppressed_pos:
                 continue
             
-            lemmas[key]["wordforms"].add(token["text"].lower())
-            # Store just segment_id and source text (not tokens)
-            if not any(occ["segment_id"] == seg["id"] for occ in lemmas[key]["occurrences"]):
-                lemmas[key]["occurrences"].append({
-                    "segment_id": seg["id"],
-                    "source_segment": seg["source"]
-                })
+            entry = lemmas[key]
+            entry["wordforms"].add(text.lower())
+            # Store just segment_id (source text is looked up when writing).
+            # Segments are visited once each, in order, so a repeat within this
+            # segment can only be the last id - no scan of the whole list
+            segment_ids = entry["segment_ids"]
+            if not segment_ids or segment_ids[-1] != seg["id"]:
+                segment_ids.append(seg["id"])
     
     if progress_callback:
         for msg in progress_callback(total_segments, total_segments, "Finalizing concordances...", None):
             yield msg
     
     # Merge with all lemmas from master (including suppressed, but with empty occurrences)
+    source_by_id = {seg["id"]: seg["source"] for seg in segments_with_tokens}
     working_lemmas = {}
     for key, freq_data in frequencies.items():
         if key in lemmas:
             # Non-suppressed: full concordance data
             working_lemmas[key] = {
-                "wordforms": list(lemmas[key]["wordforms"]),
-                "occurrences": lemmas[key]["occurrences"]
+                "wordforms": sorted(lemmas[key]["wordforms"]),
+                "occurrences": [
+                    {"segment_id": seg_id, "source_segment": source_by_id[seg_id]}
+                    for seg_id in lemmas[key]["segment_ids"]
+                ]
             }
         else:
             # Suppressed: keep lemma but no occurrences
@@ -553,10 +872,15 @@ def build_working_concordances_generator(project_path, segments, suppressions, p
                 "occurrences": []
             }
     
+    save_all_tokens_to_tmx(project_path, tokens_by_segid)
+    if tokens_cache is not None:
+        save_tokens_cache(project_path, tokens_cache)
+
     # Save working file
     working_file = get_cache_file(project_path)
-    with open(working_file, "w", encoding="utf-8") as f:
-        json.dump(working_lemmas, f, ensure_ascii=False, indent=2)
+    write_json(working_file, working_lemmas)
+    write_concordance_index(project_path, working_lemmas)
+    write_concordance_meta(project_path, working_lemmas)
 
 
 # -----------------------
@@ -574,14 +898,26 @@ def build_working_concordances(project_path, segments, suppressions, progress_ca
     if not os.path.exists(master_file):
         extract_lemma_frequencies(segments, project_path, progress_callback)
     
-    with open(master_file, "r", encoding="utf-8") as f:
-        frequencies = json.load(f)
+    frequencies = read_json(master_file)
+    # Sets, not the stored lists: membership is tested for every token
+    suppressed_lemmas = frozenset(suppressions.get("lemmas", []))
+    suppressed_pos = frozenset(suppressions.get("pos", []))
     
     # V1.11: Load segments with tokens from TMX
     segments_with_tokens = load_segments(project_path, include_tokens=True)
+
+    # Segments the TMX has no tokens for yet go through Stanza together, up front
+    tokens_cache = None
+    tokens_by_segid = {}
+    untokenized = [seg for seg in segments_with_tokens if not seg.get("tokens")]
+    if untokenized:
+        tokens_cache = load_tokens_cache(project_path)
+        fill_tokens_cache(untokenized, tokens_cache)
     
     # Build concordances only for non-suppressed lemmas
-    lemmas = defaultdict(lambda: {"wordforms": set(), "occurrences": []})
+    # Occurrences are collected column-wise as segment ids only; the
+    # {segment_id, source_segment} dicts are built once, when writing the cache
+    lemmas = defaultdict(lambda: {"wordforms": set(), "segment_ids": []})
     total_segments = len(segments_with_tokens)
     
     for idx, seg in enumerate(segments_with_tokens):
@@ -592,42 +928,50 @@ def build_working_concordances(project_path, segments, suppressions, progress_ca
         if seg.get("tokens"):
             tokens = seg["tokens"]
         else:
-            # Fallback: tokenize if not in TMX yet
-            tokens = tokenize_and_store_segment(project_path, seg["id"], seg["source"])
+            # Fallback: not in TMX yet (already tokenized into tokens_cache above)
+            tokens = tokenize_segment(seg["source"], tokens_cache)
+            tokens_by_segid[seg["id"]] = tokens
         
         # Process tokens to build concordances
         for token in tokens:
-            if not token["text"].isalpha():
+            text = token["text"]
+            if not text.isalpha():
                 continue
+            # Tokens saved before doc_to_tokens normalized lemmas may hold unstripped ones
             lemma = token["lemma"].strip().lower()
-            pos = token["pos"]
             if not lemma:
                 continue
+            pos = token["pos"]
             key = f"{lemma}|{pos}"
             
             # Skip suppressed lemmas/POS
-            if key in suppressions.get("lemmas", []) or pos in suppressions.get("pos", []):
+            if key in suppressed_lemmas or pos in suppressed_pos:
                 continue
             
-            lemmas[key]["wordforms"].add(token["text"].lower())
-            # Store just segment_id and source text (not tokens)
-            if not any(occ["segment_id"] == seg["id"] for occ in lemmas[key]["occurrences"]):
-                lemmas[key]["occurrences"].append({
-                    "segment_id": seg["id"],
-                    "source_segment": seg["source"]
-                })
+            entry = lemmas[key]
+            entry["wordforms"].add(text.lower())
+            # Store just segment_id (source text is looked up when writing).
+            # Segments are visited once each, in order, so a repeat within this
+            # segment can only be the last id - no scan of the whole list
+            segment_ids = entry["segment_ids"]
+            if not segment_ids or segment_ids[-1] != seg["id"]:
+                segment_ids.append(seg["id"])
     
     if progress_callback:
         progress_callback(total_segments, total_segments, "Finalizing concordances...", None)
     
     # Merge with all lemmas from master (including suppressed, but with empty occurrences)
+    source_by_id = {seg["id"]: seg["source"] for seg in segments_with_tokens}
     working_lemmas = {}
     for key, freq_data in frequencies.items():
         if key in lemmas:
             # Non-suppressed: full concordance data
             working_lemmas[key] = {
-                "wordforms": list(lemmas[key]["wordforms"]),
-                "occurrences": lemmas[key]["occurrences"]
+                "wordforms": sorted(lemmas[key]["wordforms"]),
+                "occurrences": [
+                    {"segment_id": seg_id, "source_segment": source_by_id[seg_id]}
+                    for seg_id in lemmas[key]["segment_ids"]
+                ]
             }
         else:
             # Suppressed: keep lemma but no occurrences
@@ -636,10 +980,15 @@ def build_working_concordances(project_path, segments, suppressions, progress_ca
                 "occurrences": []
             }
     
+    save_all_tokens_to_tmx(project_path, tokens_by_segid)
+    if tokens_cache is not None:
+        save_tokens_cache(project_path, tokens_cache)
+
     # Save working file
     working_file = get_cache_file(project_path)
-    with open(working_file, "w", encoding="utf-8") as f:
-        json.dump(working_lemmas, f, ensure_ascii=False, indent=2)
+    write_json(working_file, working_lemmas)
+    write_concordance_index(project_path, working_lemmas)
+    write_concordance_meta(project_path, working_lemmas)
 
 
 # -----------------------
@@ -650,17 +999,14 @@ def extract_lemmas(segments, project_path=None):
     Extract lemmas using frequency-first approach.
     If lemmas.json exists, return it.
     Otherwise, return frequency data from lemmas_master.json.
+    Wordforms are sorted lists of unique strings.
     """
     cache_file = get_cache_file(project_path) if project_path else None
     
-    # If working cache exists, use it
+    # If working cache exists, use it - wordforms are already unique on disk
     if cache_file and os.path.exists(cache_file):
         try:
-            with open(cache_file, "r", encoding="utf-8") as f:
-                cached = json.load(f)
-            for k, v in cached.items():
-                v["wordforms"] = set(v["wordforms"])
-            return cached
+            return read_json(cache_file)
         except Exception:
             pass
     
@@ -681,26 +1027,111 @@ def extract_lemmas(segments, project_path=None):
 # -----------------------
 # Update target segment in TMX
 # -----------------------
+def get_updates_log_file(project_path):
+    """Append-only log of target edits not yet folded into project.tmx"""
+    return os.path.join(project_path, "target", "updates.log")
+
+
+# Characters XML 1.0 does not allow in a document (C0 controls other than
+# tab/newline/CR, lone surrogates, U+FFFE/U+FFFF); lxml refuses to store them
+_XML_INVALID_CHARS = re.compile("[^\t\n\r\x20-\ud7ff\ue000-\ufffd\U00010000-\U0010ffff]")
+
+
+def xml_safe_text(text):
+    """Target text as a string the TMX can hold: None becomes "", XML-invalid characters are dropped"""
+    if text is None:
+        return ""
+    return _XML_INVALID_CHARS.sub("", str(text))
+
+
+# Fold updates.log into the TMX on save once it holds this many bytes
+UPDATES_LOG_COMPACT_SIZE = 1024 * 1024
+
+
 def update_target_segment(project_path, segment_id, new_text):
-    tmx_file = get_tmx_file(project_path)
-    tree = ET.parse(tmx_file)
-    root = tree.getroot()
-    body = root.find("body")
+    """
+    Record a target edit by appending one JSON line to updates.log, instead of
+    rewriting the whole TMX per save. compact_tmx() folds the log back in.
+    Characters XML can't hold are dropped here, so a logged edit always applies.
+    Once the log grows past UPDATES_LOG_COMPACT_SIZE it is folded in here.
+    """
+    get_tmx_file(project_path)
+    log_file = get_updates_log_file(project_path)
+    line = json.dumps([segment_id, xml_safe_text(new_text), datetime.utcnow().isoformat()], ensure_ascii=False) + "\n"
+    with tmx_lock(project_path):
+        fd = os.open(log_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line.encode("utf-8"))
+            log_size = os.fstat(fd).st_size
+        finally:
+            os.close(fd)
+        tmx_changed.set()
+        if log_size > UPDATES_LOG_COMPACT_SIZE:
+            compact_tmx(project_path)
 
-    # Namespace mapping for xml:lang
-    namespaces = {"xml": "http://www.w3.org/XML/1998/namespace"}
 
-    for tu in body.findall("tu"):
-        tuid = tu.attrib.get("tuid")
-        if segment_id == tuid:
-            tuv_tgt = tu.find("./tuv[@xml:lang='target']", namespaces=namespaces)
-            if tuv_tgt is None:
-                tuv_tgt = ET.SubElement(tu, "tuv", {"xml:lang": "target"})
-            seg_elem = tuv_tgt.find("seg")
-            if seg_elem is None:
-                seg_elem = ET.SubElement(tuv_tgt, "seg")
-            seg_elem.text = new_text
-            tu.attrib["last_updated"] = datetime.utcnow().isoformat()
-            break
-
-    tree.write(tmx_file, encoding="utf-8", xml_declaration=True, method="xml")
+def read_updates_log(log_file):
+    """
+    Pending edits in updates.log as {segment_id: (target_text, timestamp)},
+    last edit per segment winning. None if there is no log.
+    Callers hold the project's tmx_lock.
+    """
+    try:
+        with open(log_file, "rb") as f:
+            lines = f.read().splitlines()
+    except FileNotFoundError:
+        return None
+
+    updates = {}
+    for line in lines:
+        try:
+            segment_id, new_text, timestamp = json.loads(line)
+        except ValueError:
+            # Torn last line from a crash mid-append
+            continue
+        # Logs written before edits were sanitized may hold invalid characters
+        updates[segment_id] = (xml_safe_text(new_text), timestamp)
+    return updates
+
+
+def apply_target_updates(body, updates):
+    """Set target text and last_updated on the <tu>s of a parsed TMX body from read_updates_log() output"""
+    for tu in body.iterfind("tu"):
+        update = updates.get(tu.attrib.get("tuid"))
+        if update is None:
+            continue
+        tuv_tgt = next((tuv for tuv in tu.iterfind("tuv") if tuv.get(XML_LANG) == "target"), None)
+        if tuv_tgt is None:
+            tuv_tgt = ET.SubElement(tu, "tuv", {XML_LANG: "target"})
+        seg_elem = tuv_tgt.find("seg")
+        if seg_elem is None:
+            seg_elem = ET.SubElement(tuv_tgt, "seg")
+        seg_elem.text, tu.attrib["last_updated"] = update
+
+
+def compact_tmx(project_path):
+    """
+    Apply updates.log to project.tmx (last edit per segment wins) and remove the log.
+    The log is kept if there is no TMX to apply it to.
+    Returns True if the TMX was rewritten.
+    """
+    log_file = get_updates_log_file(project_path)
+    tmx_file = os.path.join(project_path, "target", "project.tmx")
+    with tmx_lock(project_path):
+        updates = read_updates_log(log_file)
+        if updates is None or not os.path.exists(tmx_file):
+            return False
+
+        if updates:
+            tree = ET.parse(tmx_file)
+            apply_target_updates(tree.getroot().find("body"), updates)
+
+            # Write next to the TMX and swap it in, so a crash mid-write can't truncate the translation
+            tmp_file = tmx_file + ".tmp"
+            tree.write(tmp_file, encoding="utf-8", xml_declaration=True, method="xml")
+            os.replace(tmp_file, tmx_file)
+            invalidate_segments_cache(tmx_file)
+
+        # Only torn lines, or every edit now in the TMX
+        os.remove(log_file)
+        return bool(updates)